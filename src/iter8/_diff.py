@@ -0,0 +1,27 @@
+import numpy as np
+
+# Below this many cells the NumPy expression is faster than dispatching to numba threads
+NUMBA_MIN_CELLS = 100_000
+
+
+def _numpy_diff_coords(a, b):
+    """Returns (rows, cols) where a and b differ, treating NaN == NaN as unchanged."""
+    # x != x is only True for NaN, so this also works for int and bool arrays
+    changed = (a != b) & ~((a != a) & (b != b))
+    return np.nonzero(changed)
+
+
+def diff_coords(a, b):
+    """
+    Returns (rows, cols) of the cells where two same-shape numeric 2D arrays differ,
+    in row-major order. Cells that are NaN in both arrays count as unchanged.
+    """
+    if a.size >= NUMBA_MIN_CELLS:
+        # numba is optional (install with the 'fast' extra) and only imported when needed
+        try:
+            from ._diff_numba import diff_coords as numba_diff_coords
+        except ImportError:
+            pass
+        else:
+            return numba_diff_coords(a, b)
+    return _numpy_diff_coords(a, b)
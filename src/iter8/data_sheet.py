@@ -1,8 +1,11 @@
+import functools
 import pandas as pd
 import os
 import gspread
 import numpy as np
 
+from ._diff import diff_coords
+
 class DfSheet:
     def __init__(self, sheet):
         self.sheet = sheet
@@ -63,24 +66,35 @@ class DataSheet(pd.DataFrame):
         """
         return _UpdateContext(self)
     
+@functools.lru_cache(maxsize=None)
+def _column_letters(n_cols):
+    """Returns A1 column letters for the first n_cols columns, memoized by column count."""
+    return tuple(gspread.utils.rowcol_to_a1(1, i + 1)[:-1] for i in range(n_cols))
+
 class _UpdateContext:
     def __init__(self, original_df):
         self.original_df: pd.DataFrame = original_df
         self.worksheet: gspread.Worksheet = original_df._worksheet
         
     def __enter__(self):
-        # Create a copy for modifications
-        self.copy_df = self.original_df.copy()
+        # Create a copy for modifications. deep=None is lazy when pandas Copy-on-Write
+        # is enabled (blocks are only copied once the caller writes to them) and a
+        # regular deep copy otherwise (pandas >= 2.0)
+        self.copy_df = self.original_df.copy(deep=None)
         return self.copy_df
 
     def _calculate_updates(self):
         """Compares the copied DataFrame with the original and returns a list of updates for gspread, preserving column order."""
+        return self.diff(self.original_df, self.copy_df)
+
+    @staticmethod
+    def diff(original_df, copy_df):
+        """Returns the gspread batch_update payload turning original_df into copy_df, preserving column order. Has no side effects."""
         header_updates = []
-        cell_updates = []
 
         # Step 1: Identify Column Sets & Order
-        original_columns_list = list(self.original_df.columns)
-        final_columns_list = list(self.copy_df.columns) # Target order
+        original_columns_list = list(original_df.columns)
+        final_columns_list = list(copy_df.columns) # Target order
         original_columns_set = set(original_columns_list)
         final_columns_set = set(final_columns_list)
 
@@ -90,82 +104,86 @@ class _UpdateContext:
         # Map final column names to their 0-based index for A1 calculation
         final_col_to_idx = {col_name: i for i, col_name in enumerate(final_columns_list)}
 
+        col_letters = _column_letters(len(final_columns_list))
+
         # Step 2: Prepare Header Updates (Preserving Order)
         if new_columns_list:
             for col_name in new_columns_list: # Iterate in the order they appear in final_columns_list
-                sheet_col_idx = final_col_to_idx[col_name]
-                col_letter = gspread.utils.rowcol_to_a1(1, sheet_col_idx + 1)[:-1]
+                col_letter = col_letters[final_col_to_idx[col_name]]
                 header_updates.append({
                     "range": f"{col_letter}1",
                     "values": [[col_name]]
                 })
 
         # Step 3: Create Aligned Temporary DataFrames (Preserving Order)
-        # Ensure consistent index type for comparison/reindexing if needed
-        # self.original_df.index = self.original_df.index.astype(self.copy_df.index.dtype)
-
-        temp_original_df = self.original_df.copy()
-        temp_copy_df = self.copy_df.copy()
-
-        # Reindex both using the final desired column order
         # Use pd.NA for compatible missing value representation if possible
         try:
-            temp_original_df = temp_original_df.reindex(columns=final_columns_list, fill_value=pd.NA)
+            temp_original_df = original_df.reindex(columns=final_columns_list, fill_value=pd.NA)
             # temp_copy_df doesn't strictly need reindexing if final_columns_list came from it,
             # but doing so ensures the columns object is identical, which might be safer.
-            temp_copy_df = temp_copy_df.reindex(columns=final_columns_list, fill_value=pd.NA)
+            temp_copy_df = copy_df.reindex(columns=final_columns_list, fill_value=pd.NA)
         except TypeError: # Fallback for older pandas versions that might not support pd.NA in fill_value
-             temp_original_df = temp_original_df.reindex(columns=final_columns_list, fill_value=np.nan)
-             temp_copy_df = temp_copy_df.reindex(columns=final_columns_list, fill_value=np.nan)
-
-        # Ensure indices match for proper comparison row-wise
-        # This shouldn't be necessary if copy_df starts as a copy and indices aren't modified,
-        # but as a safeguard:
-        common_index = self.original_df.index.intersection(self.copy_df.index)
-        # If indices *could* diverge, filter temps: (but let's assume they don't for this use case)
-        # temp_original_df = temp_original_df.loc[common_index]
-        # temp_copy_df = temp_copy_df.loc[common_index]
-
-        # Step 4: Calculate Cell Value Updates (Simplified Diff, Order-Aware)
-        # Use .compare() for detailed differences, handling NaNs correctly by default
-        # compare() returns a DataFrame with multi-index columns ('self', 'other')
-        diff = temp_original_df.compare(temp_copy_df, keep_shape=False, keep_equal=False)
-        print("\nDifferences found:")
-        print(diff.to_string())
-        
+             temp_original_df = original_df.reindex(columns=final_columns_list, fill_value=np.nan)
+             temp_copy_df = copy_df.reindex(columns=final_columns_list, fill_value=np.nan)
+
+        # Rows are matched positionally below, so indices must be identical
+        if not temp_original_df.index.equals(temp_copy_df.index):
+            raise ValueError("Can only compare identically-labeled DataFrame objects")
+
+        # Step 4: Calculate Cell Value Updates (Vectorized Diff, Order-Aware)
+        # If every column in both frames has the same plain numeric dtype, diff the native
+        # arrays directly. Otherwise (strings, new columns, nullable dtypes) use object dtype,
+        # which keeps Python scalars (JSON-serializable) and a uniform NA check.
+        copy_dtypes = set(temp_copy_df.dtypes)
+        native = (
+            len(copy_dtypes) == 1
+            and set(temp_original_df.dtypes) == copy_dtypes
+            and all(isinstance(dtype, np.dtype) and dtype.kind in 'biuf' for dtype in copy_dtypes)
+        )
+        if native:
+            copy_values = temp_copy_df.to_numpy()
+            # NaN-aware diff without boxing (numba-compiled for large sheets when available)
+            rows, cols = diff_coords(temp_original_df.to_numpy(), copy_values)
+        else:
+            original_values = temp_original_df.to_numpy(dtype=object)
+            copy_values = temp_copy_df.to_numpy(dtype=object)
+            original_na = pd.isna(original_values)
+            copy_na = pd.isna(copy_values)
+
+            # Replace NA with None before comparing: pd.NA != x is pd.NA, which can't be used as a mask
+            neq = np.where(original_na, None, original_values) != np.where(copy_na, None, copy_values)
+            # A cell changed if the values differ and they are not both missing
+            changed = neq & ~(original_na & copy_na)
+            rows, cols = np.where(changed)
+
+        # Coalesce horizontally adjacent changes into runs: [row, first_col, last_col, values]
+        # np.where yields coordinates in row-major order, so runs are contiguous in the scan
+        runs = []
+        for r, c in zip(rows, cols):
+            # NumPy scalar -> Python scalar for the JSON payload
+            value = copy_values[r, c].item() if native else copy_values[r, c]
+            # Format value for sheet (NaN/NA -> "")
+            if pd.isna(value):
+                value = ""
+            if runs and runs[-1][0] == r and runs[-1][2] == c - 1:
+                runs[-1][2] = c
+                runs[-1][3].append(value)
+            else:
+                runs.append([r, c, c, [value]])
+
         # Map DataFrame index to sheet row number (+2 for 1-based index and header)
-        index_to_sheet_row = {idx: idx + 2 for idx in self.original_df.index}
-
-        for idx in diff.index:
-            assert idx in index_to_sheet_row
-
-            sheet_row = index_to_sheet_row[idx]
-            
-            # Get columns where differences were found
-            diff_cols = diff.columns.get_level_values(0).unique()
-            
-            # For each changed column, get the 'other' value
-            for col_name in diff_cols:
-                # Access the original and new values using the MultiIndex
-                orig_value = diff.loc[idx, (col_name, 'self')]
-                new_value = diff.loc[idx, (col_name, 'other')]
-                
-                # Skip if both values are NaN (this is the key fix)
-                if pd.isna(orig_value) and pd.isna(new_value):
-                    continue
-                
-                sheet_col_idx = final_col_to_idx[col_name]
-                col_letter = gspread.utils.rowcol_to_a1(1, sheet_col_idx + 1)[:-1]
-                
-                # Format value for sheet (NaN/NA -> "")
-                update_value = "" if pd.isna(new_value) else new_value
-                
-                cell_updates.append({
-                    "range": f"{col_letter}{sheet_row}",
-                    "values": [[update_value]]
-                })
+        index = temp_copy_df.index
+        cell_updates = []
+        for r, first_col, last_col, values in runs:
+            sheet_row = str(index[r] + 2)
+            cell_range = col_letters[first_col] + sheet_row
+            if last_col != first_col:
+                cell_range += ":" + col_letters[last_col] + sheet_row
+            cell_updates.append({
+                "range": cell_range,
+                "values": [values]
+            })
 
-                
         # Step 5: Combine and Return
         return header_updates + cell_updates
 
@@ -184,7 +202,7 @@ class _UpdateContext:
             try:
                 # Apply batch updates to the Google Sheet
                 self.worksheet.batch_update(updates, value_input_option='USER_ENTERED')
-                print(f"Updated {len(updates)} cells in Google Sheet.")
+                print(f"Updated {len(updates)} ranges in Google Sheet.")
                 print(f"{updates=}")
 
                 # Update the original DataFrame in memory to match the modified copy
@@ -1,16 +1,31 @@
+import os
 import pytest
 import pandas as pd
-from unittest.mock import MagicMock, patch
+from unittest.mock import Mock, patch
 import numpy as np
 import gspread
 
 # Assuming DataSheet class is in src.iter8.data_sheet
 from iter8.data_sheet import DataSheet, _UpdateContext
 
-@pytest.fixture
-def mock_worksheet():
-    """Provides a mock gspread worksheet object."""
-    ws = MagicMock()
+# Cap numba's parallel kernels: under `make test-parallel` pytest-xdist already runs one worker per core.
+# Must be set before numba is first imported.
+os.environ.setdefault("NUMBA_NUM_THREADS", "2")
+
+# Copy-on-Write makes .copy(deep=None) a lazy copy that shares block memory
+# until one side is written to, so snapshot copies in tests are free.
+# It is always on from pandas 3.0.
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+@pytest.fixture(scope="session")
+def _base_df():
+    """
+    Builds the mock-backed DataSheet once per session (once per worker under pytest-xdist).
+    Tests never touch this frame directly; they receive lazy CoW copies of it.
+    """
+    ws = Mock(spec=gspread.Worksheet)
+    ws.batch_update = Mock()
     # Simulate get_all_records returning a list of dicts
     # Values are named to reflect their expected Sheet cell location for clarity
     ws.get_all_records.return_value = [
@@ -23,20 +38,70 @@ def mock_worksheet():
     ]
     # Add a name attribute for easier debugging if needed
     ws.name = "MockWorksheet"
+
+    # Mock the client methods used in from_sheet
+    with patch.object(DataSheet, 'gspread_client') as mock_gspread_client:
+        mock_gspread_client.open_by_key.return_value.worksheet.return_value = ws
+        ds = DataSheet.from_sheet(id='fake_id', sheet_id='fake_sheet')
+
+    # Freeze the shared blocks of this session base frame. Writes to the per-test copies
+    # still succeed (CoW copies a shared block before writing); only a direct in-place
+    # write into these blocks fails with "assignment destination is read-only".
+    for blk in ds._mgr.blocks:
+        if isinstance(blk.values, np.ndarray):
+            blk.values.flags.writeable = False
+    return ds
+
+def _assert_frame_unchanged(df, expected):
+    """
+    Cheap stand-in for assert_frame_equal on "nothing changed" checks: compares
+    labels and dtypes (O(ncols)), then values via one C-level hashing pass per frame.
+    """
+    assert df.shape == expected.shape
+    assert df.columns.equals(expected.columns)
+    assert df.dtypes.equals(expected.dtypes)
+    assert pd.util.hash_pandas_object(df, index=True).equals(
+        pd.util.hash_pandas_object(expected, index=True))
+
+@pytest.fixture
+def assert_frame_unchanged():
+    """Provides _assert_frame_unchanged(df, expected) to tests."""
+    return _assert_frame_unchanged
+
+@pytest.fixture
+def _base_df_unchanged(_base_df):
+    """Checks after every test that the session base frame was neither modified nor unfrozen."""
+    before = _base_df.copy(deep=None) # Lazy CoW snapshot
+    yield
+    _assert_frame_unchanged(_base_df, before)
+    assert all(
+        not blk.values.flags.writeable
+        for blk in _base_df._mgr.blocks
+        if isinstance(blk.values, np.ndarray)
+    )
+
+@pytest.fixture
+def mock_worksheet(_base_df):
+    """Provides the shared mock gspread worksheet, reset for the current test."""
+    ws = _base_df._worksheet
+    ws.reset_mock()
+    ws.batch_update = Mock() # Fresh mock; a previous test may have swapped in a recorder
     return ws
 
 @pytest.fixture
-@patch('iter8.data_sheet.gspread.oauth') # Mock gspread connection
-@patch.object(DataSheet, 'gspread_client') # Ensure we use the mocked client
-def data_sheet_instance(mock_gspread_client_cls, mock_oauth, mock_worksheet):
-    """Provides a DataSheet instance initialized with mock data."""
-    # Mock the client methods used in from_sheet
-    mock_spreadsheet = MagicMock()
-    mock_spreadsheet.worksheet.return_value = mock_worksheet
-    mock_gspread_client_cls.open_by_key.return_value = mock_spreadsheet
-    DataSheet.gspread_client = mock_gspread_client_cls # Assign the mocked client
+def record_batch_update(mock_worksheet):
+    """
+    Replaces mock_worksheet.batch_update with a plain recorder.
+    Returns (mock_worksheet, calls), where calls holds one (payload, kwargs) tuple per call.
+    """
+    calls = []
+    mock_worksheet.batch_update = lambda payload, **kwargs: calls.append((payload, kwargs))
+    return mock_worksheet, calls
 
-    # Create instance using the class method which uses the mocked client
-    ds = DataSheet.from_sheet(id='fake_id', sheet_id='fake_sheet')
+@pytest.fixture
+def data_sheet_instance(_base_df, _base_df_unchanged, mock_worksheet):
+    """Provides a DataSheet instance initialized with mock data."""
+    # Lazy CoW copy: blocks are shared with _base_df until the test writes to them
+    ds = DataSheet(_base_df.copy(deep=None))
     ds._worksheet = mock_worksheet # Ensure the instance holds the direct mock
     return ds
@@ -1,8 +1,10 @@
 import pytest
 import pandas as pd
-from unittest.mock import MagicMock, patch, call # Use MagicMock for more flexibility
+from pandas.testing import assert_frame_equal
+from unittest.mock import MagicMock, call # Use MagicMock for more flexibility
 import numpy as np # For NaN values
 import gspread # Import gspread module for exceptions
+from gspread.utils import a1_to_rowcol, rowcol_to_a1
 
 # Assuming your DataSheet class is in src.iter8.data_sheet
 from iter8.data_sheet import DataSheet, _UpdateContext
@@ -10,80 +12,152 @@ from iter8.data_sheet import DataSheet, _UpdateContext
 # --- Fixtures --- 
 # Fixtures are now defined in tests/conftest.py and are automatically discovered by pytest
 
+# --- Helpers ---
+
+def _covered_cells(payload):
+    """Expands a batch_update payload into the set of single-cell A1 labels it writes."""
+    cells = set()
+    for update in payload:
+        start_row, start_col = a1_to_rowcol(update['range'].split(':')[0])
+        for row_offset, row_values in enumerate(update['values']):
+            for col_offset, _ in enumerate(row_values):
+                cells.add(rowcol_to_a1(start_row + row_offset, start_col + col_offset))
+    return cells
+
 # --- Test Cases ---
 
-def test_context_manager_no_changes(data_sheet_instance, mock_worksheet):
+def test_context_manager_no_changes(data_sheet_instance, record_batch_update, assert_frame_unchanged):
     """
     Test that no updates occur if the DataFrame copy is not modified.
     """
-    original_df_copy = data_sheet_instance.copy() # Keep a copy for comparison
+    _, calls = record_batch_update
+    original_df_copy = data_sheet_instance.copy(deep=None) # Lazy CoW copy for comparison
 
     with data_sheet_instance.start_update() as change:
         # No changes made to 'change' DataFrame
         pass
 
     # Assertions
-    mock_worksheet.batch_update.assert_not_called()
-    pd.testing.assert_frame_equal(data_sheet_instance, original_df_copy)
+    assert calls == []
+    assert_frame_unchanged(data_sheet_instance, original_df_copy)
+
+def test_no_changes_no_block_copy(data_sheet_instance, record_batch_update):
+    """
+    Test that entering the context hands out a lazy copy sharing memory with the original.
+    """
+    _, calls = record_batch_update
+
+    with data_sheet_instance.start_update() as change:
+        assert np.shares_memory(change._mgr.blocks[0].values, data_sheet_instance._mgr.blocks[0].values)
+
+    # Assertions
+    assert calls == []
+
+@pytest.mark.skipif(int(pd.__version__.split('.')[0]) >= 3, reason="Copy-on-Write is always on from pandas 3.0")
+def test_context_manager_change_without_copy_on_write(data_sheet_instance, record_batch_update):
+    """
+    Test that start_update still hands out an independent copy when Copy-on-Write is off.
+    """
+    _, calls = record_batch_update
+
+    with pd.option_context("mode.copy_on_write", False):
+        with data_sheet_instance.start_update() as change:
+            assert not np.shares_memory(change._mgr.blocks[0].values, data_sheet_instance._mgr.blocks[0].values)
+            change.at[1, 'col_b'] = 'Updated B3'
+            # Writes to the copy must not leak into the original before exit
+            assert data_sheet_instance.at[1, 'col_b'] == 'B3_val'
+
+    # Assertions
+    assert len(calls) == 1
+    payload, _ = calls[0]
+    assert payload == [{'range': 'B3', 'values': [['Updated B3']]}]
+    assert data_sheet_instance.at[1, 'col_b'] == 'Updated B3'
 
-def test_context_manager_single_cell_change(data_sheet_instance, mock_worksheet):
+def test_context_manager_single_cell_change(data_sheet_instance, record_batch_update):
     """
     Test update after changing a single cell.
     Integration test: Verifies context manager calls update and updates the DataFrame.
     """
+    _, calls = record_batch_update
     # Check original value first to ensure test validity
-    assert data_sheet_instance.loc[1, 'col_b'] == 'B3_val'
+    assert data_sheet_instance.at[1, 'col_b'] == 'B3_val'
 
     with data_sheet_instance.start_update() as change:
         # Change B3 (index 1, col_b)
-        change.loc[1, 'col_b'] = 'Updated B3'
+        change.at[1, 'col_b'] = 'Updated B3'
 
     # Assertions
     # 1. Check sheet update attempt
-    mock_worksheet.batch_update.assert_called_once()
-    call_args, call_kwargs = mock_worksheet.batch_update.call_args
+    assert len(calls) == 1
+    payload, call_kwargs = calls[0]
     # Verify one update was generated
-    assert len(call_args[0]) == 1 
+    assert len(payload) == 1 
     assert call_kwargs.get('value_input_option') == 'USER_ENTERED'
     # (Payload content verified by unit test)
 
     # 2. Check if the original DataFrame was updated
-    assert data_sheet_instance.loc[1, 'col_b'] == 'Updated B3'
+    assert data_sheet_instance.at[1, 'col_b'] == 'Updated B3'
 
-def test_context_manager_multiple_cell_changes(data_sheet_instance, mock_worksheet):
+def test_context_manager_multiple_cell_changes(data_sheet_instance, record_batch_update):
     """
     Test update after changing multiple cells in different rows/columns.
     Integration test: Verifies context manager calls update and updates the DataFrame.
     """
+    _, calls = record_batch_update
     # Check original values first
-    assert data_sheet_instance.loc[0, 'col_c'] == 10
-    assert data_sheet_instance.loc[2, 'col_d'] == 'D4_val'
+    assert data_sheet_instance.at[0, 'col_c'] == 10
+    assert data_sheet_instance.at[2, 'col_d'] == 'D4_val'
     
     with data_sheet_instance.start_update() as change:
         # Change C2 (index 0, col_c) and D4 (index 2, col_d)
-        change.loc[0, 'col_c'] = 99
-        change.loc[2, 'col_d'] = 'New D4 val'
+        change.at[0, 'col_c'] = 99
+        change.at[2, 'col_d'] = 'New D4 val'
 
     # Assertions
     # 1. Check sheet update attempt
-    mock_worksheet.batch_update.assert_called_once()
-    call_args, call_kwargs = mock_worksheet.batch_update.call_args
-    # Check expected number of updates
-    assert len(call_args[0]) == 2 # Two changes made
+    assert len(calls) == 1
+    payload, call_kwargs = calls[0]
+    # Adjacent changes may be coalesced, so expect at most one range per change
+    assert len(payload) <= 2 # Two changes made
     assert call_kwargs.get('value_input_option') == 'USER_ENTERED'
-    # (Payload content verified by unit test)
+    # Together the ranges cover exactly the changed cells
+    assert _covered_cells(payload) == {'C2', 'D4'}
 
     # 2. Check if the original DataFrame was updated correctly
-    assert data_sheet_instance.loc[0, 'col_c'] == 99
-    assert data_sheet_instance.loc[2, 'col_d'] == 'New D4 val'
+    assert data_sheet_instance.at[0, 'col_c'] == 99
+    assert data_sheet_instance.at[2, 'col_d'] == 'New D4 val'
 
-def test_context_manager_change_with_df_update(data_sheet_instance, mock_worksheet):
+def test_context_manager_change_with_loc_block_write(data_sheet_instance, record_batch_update):
+    """
+    Test change detection when writing an update DataFrame into the copy with .loc.
+    Integration test: Verifies context manager calls update and updates the DataFrame.
+    """
+    _, calls = record_batch_update
+    # Check original value first
+    assert data_sheet_instance.at[0, 'col_b'] == 'B2_val'
+
+    update_df = pd.DataFrame({'col_b': ['Updated B2 via .loc']}, index=[0])
+    with data_sheet_instance.start_update() as change:
+        # Update B2 (index 0, col_b) with a bounded write of update_df's cells only
+        change.loc[update_df.index, update_df.columns] = update_df.values
+
+    # Assertions
+    # 1. Check sheet update attempt
+    assert len(calls) == 1
+    payload, call_kwargs = calls[0]
+    assert payload == [{'range': 'B2', 'values': [['Updated B2 via .loc']]}]
+
+    # 2. Check original DataFrame update
+    assert data_sheet_instance.at[0, 'col_b'] == 'Updated B2 via .loc'
+
+def test_context_manager_change_with_df_update(data_sheet_instance, record_batch_update):
     """
     Test change detection when using df.update().
     Integration test: Verifies context manager calls update and updates the DataFrame.
     """
+    _, calls = record_batch_update
     # Check original value first
-    assert data_sheet_instance.loc[0, 'col_b'] == 'B2_val'
+    assert data_sheet_instance.at[0, 'col_b'] == 'B2_val'
 
     with data_sheet_instance.start_update() as change:
         # Update B2 (index 0, col_b) using df.update()
@@ -91,133 +165,128 @@ def test_context_manager_change_with_df_update(data_sheet_instance, mock_workshe
 
     # Assertions
     # 1. Check sheet update attempt
-    mock_worksheet.batch_update.assert_called_once()
-    call_args, call_kwargs = mock_worksheet.batch_update.call_args
-    # Check expected number of updates
-    assert len(call_args[0]) == 1
-    # (Payload content verified by unit tests - need specific test for df.update effects)
+    assert len(calls) == 1
+    payload, call_kwargs = calls[0]
+    assert payload == [{'range': 'B2', 'values': [['Updated B2 via df.update']]}]
 
     # 2. Check original DataFrame update
-    assert data_sheet_instance.loc[0, 'col_b'] == 'Updated B2 via df.update'
+    assert data_sheet_instance.at[0, 'col_b'] == 'Updated B2 via df.update'
 
-def test_context_manager_change_nan_to_value(data_sheet_instance, mock_worksheet):
+def test_context_manager_change_nan_to_value(data_sheet_instance, record_batch_update):
     """
     Test changing a NaN value to a string.
     Integration test: Verifies context manager calls update and updates the DataFrame.
     """
+    _, calls = record_batch_update
     # Check original value first
-    assert pd.isna(data_sheet_instance.loc[1, 'col_d'])
+    assert pd.isna(data_sheet_instance.at[1, 'col_d'])
     
     with data_sheet_instance.start_update() as change:
         # Change D3 (index 1, col_d) from NaN
-        change.loc[1, 'col_d'] = 'Value from NaN'
+        change.at[1, 'col_d'] = 'Value from NaN'
 
     # Assertions
     # 1. Check sheet update attempt
-    mock_worksheet.batch_update.assert_called_once()
-    call_args, call_kwargs = mock_worksheet.batch_update.call_args
-    assert len(call_args[0]) == 1
+    assert len(calls) == 1
+    payload, call_kwargs = calls[0]
+    assert len(payload) == 1
     # (Payload content verified by unit test)
 
     # 2. Check original DataFrame update
-    assert data_sheet_instance.loc[1, 'col_d'] == 'Value from NaN'
+    assert data_sheet_instance.at[1, 'col_d'] == 'Value from NaN'
 
-def test_context_manager_change_value_to_empty(data_sheet_instance, mock_worksheet):
+def test_context_manager_change_value_to_empty(data_sheet_instance, record_batch_update):
     """
     Test changing a string value to an empty string.
     """
+    _, calls = record_batch_update
     # Check original value first
-    assert data_sheet_instance.loc[2, 'col_d'] == 'D4_val'
+    assert data_sheet_instance.at[2, 'col_d'] == 'D4_val'
 
     with data_sheet_instance.start_update() as change:
         # Change D4 (index 2, col_d) from 'D4_val' to empty
-        change.loc[2, 'col_d'] = ''
+        change.at[2, 'col_d'] = ''
 
     # Assertions
     # 1. Check sheet update attempt
-    mock_worksheet.batch_update.assert_called_once()
-    call_args, call_kwargs = mock_worksheet.batch_update.call_args
-    assert len(call_args[0]) == 1
+    assert len(calls) == 1
+    payload, call_kwargs = calls[0]
+    assert len(payload) == 1
     # (Payload content verified by unit tests)
 
     # 2. Check original DataFrame update
-    assert data_sheet_instance.loc[2, 'col_d'] == ''
+    assert data_sheet_instance.at[2, 'col_d'] == ''
 
-def test_context_manager_exception_inside_with(data_sheet_instance, mock_worksheet):
+def test_context_manager_exception_inside_with(data_sheet_instance, record_batch_update, assert_frame_unchanged):
     """
     Test that no updates occur if an exception is raised inside the 'with' block.
     """
-    original_df_copy = data_sheet_instance.copy()
+    _, calls = record_batch_update
+    original_df_copy = data_sheet_instance.copy(deep=None)
     
     with pytest.raises(ValueError, match="Something went wrong inside!"):
         with data_sheet_instance.start_update() as change:
-            change.loc[0, 'col_b'] = "This change won't happen"
+            change.at[0, 'col_b'] = "This change won't happen"
             raise ValueError("Something went wrong inside!")
 
     # Assertions
-    mock_worksheet.batch_update.assert_not_called()
+    assert calls == []
     # Original DataFrame should remain unchanged
-    pd.testing.assert_frame_equal(data_sheet_instance, original_df_copy)
+    assert_frame_unchanged(data_sheet_instance, original_df_copy)
 
-def test_context_manager_gspread_update_fails(data_sheet_instance, mock_worksheet):
+def test_context_manager_gspread_update_fails(data_sheet_instance, mock_worksheet, capsys):
     """
     Test handling when worksheet.batch_update raises an error.
     """
-    original_df_copy = data_sheet_instance.copy()
+    original_df_copy = data_sheet_instance.copy(deep=None)
     # Check original value first
-    assert data_sheet_instance.loc[0, 'col_b'] == 'B2_val'
+    assert data_sheet_instance.at[0, 'col_b'] == 'B2_val'
     
     # Configure mock to raise exception
     gspread_exception = Exception("API limit reached")
     mock_worksheet.batch_update.side_effect = gspread_exception
 
-    # Test with a patch to capture print output
-    with patch('builtins.print') as mock_print:
-        with data_sheet_instance.start_update() as change:
-            # Change B2 (index 0, col_b)
-            change.loc[0, 'col_b'] = "Change that fails"
+    with data_sheet_instance.start_update() as change:
+        # Change B2 (index 0, col_b)
+        change.at[0, 'col_b'] = "Change that fails"
 
     # Assertions
     # 1. Check update attempt was made
     mock_worksheet.batch_update.assert_called_once()
     
     # 2. Check original DataFrame was NOT updated
-    pd.testing.assert_frame_equal(data_sheet_instance, original_df_copy, check_dtype=False)
+    assert_frame_equal(data_sheet_instance, original_df_copy, check_dtype=False)
     
     # 3. Check error was printed
-    mock_print.assert_any_call(f"Error during sheet update: {gspread_exception}")
+    captured = capsys.readouterr()
+    assert f"Error during sheet update: {gspread_exception}" in captured.out
 
-def test_column_renaming_or_dropping_impact(data_sheet_instance, mock_worksheet):
+def test_column_renaming_or_dropping_impact(data_sheet_instance, record_batch_update):
     """
     Test potential issues if columns are renamed or dropped in the copy.
     (Current logic should ignore dropped/renamed cols and only update existing matched ones)
     """
-    original_df_copy = data_sheet_instance.copy()
+    _, calls = record_batch_update
+    original_df_copy = data_sheet_instance.copy(deep=None)
     # Check original values
-    assert data_sheet_instance.loc[0, 'col_b'] == 'B2_val'
-    assert data_sheet_instance.loc[0, 'col_c'] == 10
+    assert data_sheet_instance.at[0, 'col_b'] == 'B2_val'
+    assert data_sheet_instance.at[0, 'col_c'] == 10
 
     with data_sheet_instance.start_update() as change:
          # Change existing B2 (index 0, col_b)
-         change.loc[0, 'col_b'] = "Valid Change"
+         change.at[0, 'col_b'] = "Valid Change"
          # Try modifications that shouldn't affect the diff calculation for *existing* cols
          # change.drop(columns=['col_c'], inplace=True) 
          # change.rename(columns={'col_d': 'col_d_new'}, inplace=True) 
 
     # Assertions
     # 1. Check sheet update attempt
-    mock_worksheet.batch_update.assert_called_once()
-    call_args, call_kwargs = mock_worksheet.batch_update.call_args
+    assert len(calls) == 1
+    payload, call_kwargs = calls[0]
     # Check only one update (for col_b) was generated
-    assert len(call_args[0]) == 1 
+    assert len(payload) == 1 
     # (Payload details checked by unit tests)
     
     # 2. Original DF should only have 'col_b' updated
-    assert data_sheet_instance.loc[0, 'col_b'] == "Valid Change"
-    assert data_sheet_instance.loc[0, 'col_c'] == 10 # Unchanged
-
-# ===========================================
-# Integration Tests for start_update context (These remain here)
-# ===========================================
-
-# The test_context_manager_* functions remain here.
+    assert data_sheet_instance.at[0, 'col_b'] == "Valid Change"
+    assert data_sheet_instance.at[0, 'col_c'] == 10 # Unchanged
@@ -0,0 +1,56 @@
+import pytest
+
+from iter8.data_sheet import DataSheet, _UpdateContext
+
+# Benchmarks need the pytest-benchmark plugin (installed with the 'dev' extra)
+pytest.importorskip("pytest_benchmark")
+
+# ==========================================
+# Benchmarks for _calculate_updates
+# ==========================================
+# Run `make bench-baseline` once per machine, then `make bench` to compare against it;
+# a min-time regression of more than 50% fails the run.
+
+@pytest.fixture(scope="session")
+def make_data_sheet():
+    """Returns a factory building (and caching) DataSheets of a given shape."""
+    cache = {}
+
+    def factory(n_rows, n_cols, numeric=False):
+        key = (n_rows, n_cols, numeric)
+        if key not in cache:
+            ds = DataSheet({
+                f"col_{c}": [float(r * n_cols + c) if numeric else f"r{r}c{c}" for r in range(n_rows)]
+                for c in range(n_cols)
+            })
+            cache[key] = ds
+        return cache[key]
+
+    return factory
+
+@pytest.mark.parametrize("n_rows,n_cols", [(10, 10), (100, 100), (1000, 10)])
+def test_bench_calculate_updates(benchmark, make_data_sheet, n_rows, n_cols):
+    """
+    Benchmark the diff between the original DataFrame and a copy with one changed cell.
+    """
+    data_sheet_instance = make_data_sheet(n_rows, n_cols)
+    copy_df = data_sheet_instance.copy(deep=None)
+    copy_df.iloc[0, 0] = 'x'
+
+    payload = benchmark(_UpdateContext.diff, data_sheet_instance, copy_df)
+
+    assert payload == [{'range': 'A2', 'values': [['x']]}]
+
+def test_bench_calculate_updates_numeric(benchmark, make_data_sheet):
+    """
+    Benchmark the native numeric diff on a large all-float sheet with one changed cell.
+    """
+    data_sheet_instance = make_data_sheet(2000, 100, numeric=True)
+    copy_df = data_sheet_instance.copy(deep=None)
+    copy_df.iloc[0, 0] = -1.0
+
+    # Warm up once so numba import/compile time (if installed) doesn't skew the stats
+    _UpdateContext.diff(data_sheet_instance, copy_df)
+    payload = benchmark(_UpdateContext.diff, data_sheet_instance, copy_df)
+
+    assert payload == [{'range': 'A2', 'values': [[-1.0]]}]
@@ -10,55 +10,68 @@ from iter8.data_sheet import DataSheet, _UpdateContext
 
 # --- Helper Function for Unit Tests ---
 def _run_calc_updates(data_sheet_instance, modify_copy_func):
-    """Runs the common setup, modification, and calculation for _calculate_updates tests."""
+    """Runs the common setup, modification, and diff calculation for _calculate_updates tests."""
     original_df = data_sheet_instance
-    copy_df = original_df.copy()
-    context = _UpdateContext(original_df)
-    context.copy_df = copy_df
+    copy_df = original_df.copy(deep=None)
     
     # Apply the test-specific modifications
     if modify_copy_func:
         modify_copy_func(copy_df)
         
     # Calculate and return the payload
-    return context._calculate_updates()
+    return _UpdateContext.diff(original_df, copy_df)
 
 # =======================================
 # Unit Tests for _calculate_updates
 # =======================================
 
-def test_calculate_updates_single_cell(data_sheet_instance):
-    """
-    Unit test for _calculate_updates focusing on a single cell change.
-    """
-    # Define modification and expected result
-    def modify(df):
-        df.loc[1, 'col_b'] = 'Updated B3' # Simulate changing B3
-        
-    expected_payload = [
-        {'range': 'B3', 'values': [['Updated B3']]}
-    ]
-
-    # Run calculation using helper
-    actual_payload = _run_calc_updates(data_sheet_instance, modify)
-
-    # Assert the calculated payload is correct
-    # assert len(actual_payload) == 1 # Length check implied by direct comparison
-    assert actual_payload == expected_payload
-
-def test_calculate_updates_multiple_cells(data_sheet_instance):
-    """
-    Unit test for _calculate_updates focusing on multiple cell changes.
+# Each case: list of (index, column, new value) changes -> expected payload
+CALCULATE_UPDATES_CASES = [
+    pytest.param(
+        [(1, 'col_b', 'Updated B3')], # Simulate changing B3
+        [{'range': 'B3', 'values': [['Updated B3']]}],
+        id='single_cell',
+    ),
+    pytest.param(
+        # Simulate changes: C2 (10 -> 99), D4 ('D4_val' -> 'New D4 val')
+        [(0, 'col_c', 99), (2, 'col_d', 'New D4 val')],
+        [
+            {'range': 'C2', 'values': [[99]]},
+            {'range': 'D4', 'values': [['New D4 val']]},
+        ],
+        id='multiple_cells',
+    ),
+    pytest.param(
+        # Adjacent cells in one row (B3, C3, D3) are sent as a single range
+        [(1, 'col_b', 'New B3'), (1, 'col_c', 21), (1, 'col_d', 'New D3')],
+        [{'range': 'B3:D3', 'values': [['New B3', 21, 'New D3']]}],
+        id='adjacent_cells',
+    ),
+    pytest.param(
+        [(1, 'col_d', 'Now Has Value')], # Simulate changing D3 (NaN -> 'Now Has Value')
+        [{'range': 'D3', 'values': [['Now Has Value']]}],
+        id='nan_to_value',
+    ),
+    pytest.param(
+        [(2, 'col_d', '')], # Simulate changing D4 ('D4_val' -> '')
+        [{'range': 'D4', 'values': [['']]}],
+        id='value_to_empty',
+    ),
+    pytest.param(
+        [(0, 'col_c', np.nan)], # Simulate changing C2 (10 -> NaN), sent as empty string
+        [{'range': 'C2', 'values': [['']]}],
+        id='value_to_nan',
+    ),
+]
+
+@pytest.mark.parametrize("changes,expected_payload", CALCULATE_UPDATES_CASES)
+def test_calculate_updates(data_sheet_instance, changes, expected_payload):
+    """
+    Unit test for _calculate_updates focusing on changes to existing cells.
     """
     def modify(df):
-        # Simulate changes: C2 (10 -> 99), D4 ('D4_val' -> 'New D4 val')
-        df.loc[0, 'col_c'] = 99
-        df.loc[2, 'col_d'] = 'New D4 val'
-
-    expected_payload = [
-        {'range': 'C2', 'values': [[99]]},
-        {'range': 'D4', 'values': [['New D4 val']]},
-    ]
+        for idx, col, value in changes:
+            df.at[idx, col] = value
 
     actual_payload = _run_calc_updates(data_sheet_instance, modify)
 
@@ -67,50 +80,24 @@ def test_calculate_updates_multiple_cells(data_sheet_instance):
     sorted_expected = sorted(expected_payload, key=lambda x: x['range'])
     assert sorted_actual == sorted_expected
 
-def test_calculate_updates_nan_to_value(data_sheet_instance):
+def test_calculate_updates_numeric_sheet():
     """
-    Unit test for _calculate_updates: Changing NaN to a value.
+    Unit test for _calculate_updates on an all-float sheet (native dtype diff path).
     """
-    def modify(df):
-        # Simulate changing D3 (NaN -> 'Now Has Value')
-        df.loc[1, 'col_d'] = 'Now Has Value'
-        
-    expected_payload = [
-        {'range': 'D3', 'values': [['Now Has Value']]}
-    ]
-
-    actual_payload = _run_calc_updates(data_sheet_instance, modify)
-    assert actual_payload == expected_payload
-
-def test_calculate_updates_value_to_empty(data_sheet_instance):
-    """
-    Unit test for _calculate_updates: Changing a value to empty string.
-    """
-    def modify(df):
-        # Simulate changing D4 ('D4_val' -> '')
-        df.loc[2, 'col_d'] = ''
-
-    expected_payload = [
-        {'range': 'D4', 'values': [['']]}
-    ]
+    original_df = DataSheet({'x': [1.0, np.nan, 3.0], 'y': [4.0, 5.0, np.nan]})
+    copy_df = original_df.copy(deep=None)
+    copy_df.at[0, 'x'] = 1.5    # A2
+    copy_df.at[1, 'y'] = np.nan # B3 -> sent as empty string
+    # NaN left as NaN in A3 and B4 must not produce updates
 
-    actual_payload = _run_calc_updates(data_sheet_instance, modify)
-    assert actual_payload == expected_payload
+    actual_payload = _UpdateContext.diff(original_df, copy_df)
 
-def test_calculate_updates_value_to_nan(data_sheet_instance):
-    """
-    Unit test for _calculate_updates: Changing a value to NaN.
-    """
-    def modify(df):
-        # Simulate changing C2 (10 -> NaN)
-        df.loc[0, 'col_c'] = np.nan
-
-    expected_payload = [
-        {'range': 'C2', 'values': [['']]}
+    assert actual_payload == [
+        {'range': 'A2', 'values': [[1.5]]},
+        {'range': 'B3', 'values': [['']]},
     ]
-
-    actual_payload = _run_calc_updates(data_sheet_instance, modify)
-    assert actual_payload == expected_payload
+    # Values are plain Python scalars so the payload is JSON-serializable
+    assert type(actual_payload[0]['values'][0][0]) is float
 
 # --- Unit Tests for New Fields ---
 
@@ -121,7 +108,7 @@ def test_calculate_updates_add_single_new_field(data_sheet_instance):
     def modify(df):
         # Simulate adding column 'new_col_E' and setting E2='E2_val'
         df['new_col_E'] = pd.NA 
-        df.loc[0, 'new_col_E'] = 'E2_val'
+        df.at[0, 'new_col_E'] = 'E2_val'
 
     expected_payload = [
         {'range': 'E1', 'values': [['new_col_E']]},
@@ -145,10 +132,10 @@ def test_calculate_updates_add_multiple_new_fields_and_modify_existing(data_shee
         df['category'] = pd.NA
         df['in_stock'] = pd.NA
         # Set values
-        df.loc[0, 'description'] = 'Desc for E2' # description is first new col (E)
-        df.loc[1, 'category'] = 'Cat for F3'     # category is second new col (F)
-        df.loc[2, 'in_stock'] = True            # in_stock is third new col (G)
-        df.loc[0, 'col_c'] = 15.0                # Modify existing C2
+        df.at[0, 'description'] = 'Desc for E2' # description is first new col (E)
+        df.at[1, 'category'] = 'Cat for F3'     # category is second new col (F)
+        df.at[2, 'in_stock'] = True            # in_stock is third new col (G)
+        df.at[0, 'col_c'] = 15.0                # Modify existing C2
 
     expected_payload = [
         # Headers (in order of addition)
@@ -176,8 +163,8 @@ def test_calculate_updates_explicitly_setting_nan_in_new_field(data_sheet_instan
     def modify(df):
         # Simulate adding 'notes' column (becomes E) and setting E2='Note for E2', E3=NaN
         df['notes'] = pd.NA
-        df.loc[0, 'notes'] = 'Note for E2'
-        df.loc[1, 'notes'] = np.nan
+        df.at[0, 'notes'] = 'Note for E2'
+        df.at[1, 'notes'] = np.nan
 
     expected_payload = [
         {'range': 'E1', 'values': [['notes']]},
@@ -215,10 +202,8 @@ def test_calculate_updates_add_field_with_dict_assignment(data_sheet_instance):
         {'range': 'E1', 'values': [['description']]},
         {'range': 'F1', 'values': [['category']]},
         {'range': 'G1', 'values': [['tags']]},
-        # Values assigned to row index 1 (Sheet row 3)
-        {'range': 'E3', 'values': [['Dict Desc for E3']]}, # description
-        {'range': 'F3', 'values': [['Dict Cat for F3']]}, # category
-        {'range': 'G3', 'values': [['Dict Tags for G3']]}, # tags
+        # Values assigned to row index 1 (Sheet row 3), coalesced into one range
+        {'range': 'E3:G3', 'values': [['Dict Desc for E3', 'Dict Cat for F3', 'Dict Tags for G3']]},
     ]
 
     actual_payload = _run_calc_updates(data_sheet_instance, modify)
@@ -235,8 +220,8 @@ def test_calculate_updates_add_new_field_with_formula(data_sheet_instance):
     def modify(df):
         # Simulate changes: Add 'image_formula' col (becomes E), set E2=formula, change C3 (idx 1) = 12.50
         df['image_formula'] = pd.NA
-        df.loc[0, 'image_formula'] = '=IMAGE("formula_for_E2")'
-        df.loc[1, 'col_c'] = 12.50
+        df.at[0, 'image_formula'] = '=IMAGE("formula_for_E2")'
+        df.at[1, 'col_c'] = 12.50
 
     expected_payload = [
         {'range': 'E1', 'values': [['image_formula']]},
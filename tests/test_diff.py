@@ -0,0 +1,49 @@
+import pytest
+import numpy as np
+
+from iter8 import _diff
+
+# =======================================
+# Unit Tests for the numeric diff kernels
+# =======================================
+
+def _sample_arrays(dtype):
+    """Returns (original, copy) 200x50 arrays with a few changed and NaN cells."""
+    rng = np.random.default_rng(0)
+    a = rng.integers(0, 100, size=(200, 50)).astype(dtype)
+    b = a.copy()
+    b[3, 7] += 1
+    b[150, 0] += 2
+    b[199, 49] += 3
+    if dtype == np.float64:
+        a[10, 10] = b[10, 10] = np.nan # NaN in both: unchanged
+        b[20, 5] = np.nan              # value -> NaN: changed
+        a[30, 6] = np.nan              # NaN -> value: changed
+    return a, b
+
+@pytest.mark.parametrize("dtype", [np.float64, np.int64])
+def test_numpy_diff_coords(dtype):
+    """
+    The NumPy kernel reports changed cells in row-major order and ignores NaN == NaN.
+    """
+    a, b = _sample_arrays(dtype)
+    rows, cols = _diff._numpy_diff_coords(a, b)
+
+    expected = [(3, 7), (150, 0), (199, 49)]
+    if dtype == np.float64:
+        expected = [(3, 7), (20, 5), (30, 6), (150, 0), (199, 49)]
+    assert list(zip(rows.tolist(), cols.tolist())) == expected
+
+@pytest.mark.parametrize("dtype", [np.float64, np.int64])
+def test_numba_diff_coords_matches_numpy(dtype):
+    """
+    The numba kernel returns exactly the same coordinates as the NumPy kernel.
+    """
+    _diff_numba = pytest.importorskip("iter8._diff_numba")
+    a, b = _sample_arrays(dtype)
+
+    rows, cols = _diff_numba.diff_coords(a, b)
+    expected_rows, expected_cols = _diff._numpy_diff_coords(a, b)
+
+    np.testing.assert_array_equal(rows, expected_rows)
+    np.testing.assert_array_equal(cols, expected_cols)